@@ -1,8 +1,44 @@
 
+import argparse
+import gc
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from collections import OrderedDict, deque
+
 import pygame
 import random
 import math
 
+# Command line options
+SOAK_SAMPLE_SECONDS = 60  # How often soak mode records a sample
+parser = argparse.ArgumentParser(description="Football Match Simulation - Offside Learning Tool")
+parser.add_argument("--soak", type=float, metavar="HOURS",
+                    help="run headless for HOURS and report memory and latency growth")
+parser.add_argument("--soak-interval", type=float, default=SOAK_SAMPLE_SECONDS, metavar="SECONDS",
+                    help="seconds between soak samples")
+parser.add_argument("--lod-budget", type=float, default=None, metavar="PIXELS",
+                    help="how far reduced-rate AI targets may drift from full-rate ones")
+parser.add_argument("--lod-drift", action="store_true",
+                    help="also run full-rate AI during soak runs and report the drift from it")
+parser.add_argument("--season", nargs="?", const="", metavar="CONFIG_JSON",
+                    help="play a round-robin season between team configs (built-in set if no file given)")
+parser.add_argument("--season-ticks", type=int, default=5000, metavar="TICKS",
+                    help="length of each season match in ticks")
+parser.add_argument("--season-seed", type=int, default=0, metavar="SEED",
+                    help="base random seed for season fixtures")
+parser.add_argument("--season-workers", type=int, default=None, metavar="N",
+                    help="worker processes for the season (default: all cores)")
+parser.add_argument("--season-cache", default=".season_cache", metavar="DIR",
+                    help="directory for cached match results")
+args = parser.parse_args()
+
+# Soak and season runs have no window to draw into
+if args.soak is not None or args.season is not None:
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
 # Initialize Pygame
 pygame.init()
 
@@ -26,6 +62,25 @@ font = pygame.font.Font(None, 36)
 small_font = pygame.font.Font(None, 24)
 tiny_font = pygame.font.Font(None, 18)
 
+# Rendered text surfaces, reused across frames and capped so they can't pile up
+TEXT_CACHE_SIZE = 256
+text_cache = OrderedDict()
+text_renders = 0  # Cache misses, i.e. calls to font.render
+
+def render_text(text_font, text, color):
+    global text_renders
+    key = (text_font, text, color)
+    surface = text_cache.get(key)
+    if surface is None:
+        surface = text_font.render(text, True, color)
+        text_renders += 1
+        text_cache[key] = surface
+        if len(text_cache) > TEXT_CACHE_SIZE:
+            text_cache.popitem(last=False)
+    else:
+        text_cache.move_to_end(key)
+    return surface
+
 # Player and Ball settings
 PLAYER_RADIUS = 10
 BALL_RADIUS = 5
@@ -42,12 +97,44 @@ GOAL_HEIGHT = 100
 GOAL_TOP = HEIGHT // 2 - GOAL_HEIGHT // 2
 GOAL_BOTTOM = HEIGHT // 2 + GOAL_HEIGHT // 2
 
+# Formations as (role, x, [y, ...]) lines for the red team; blue mirrors them
+FORMATIONS = {
+    "4-3-3": [
+        ("DEF", 150, [150, HEIGHT//2 - 75, HEIGHT//2 + 75, HEIGHT - 150]),
+        ("MID", 300, [150, HEIGHT//2, HEIGHT - 150]),
+        ("FWD", 450, [150, HEIGHT//2, HEIGHT - 150]),
+    ],
+    "4-4-2": [
+        ("DEF", 150, [150, HEIGHT//2 - 75, HEIGHT//2 + 75, HEIGHT - 150]),
+        ("MID", 300, [120, HEIGHT//2 - 60, HEIGHT//2 + 60, HEIGHT - 120]),
+        ("FWD", 450, [HEIGHT//2 - 75, HEIGHT//2 + 75]),
+    ],
+    "3-5-2": [
+        ("DEF", 150, [HEIGHT//2 - 100, HEIGHT//2, HEIGHT//2 + 100]),
+        ("MID", 300, [100, 200, HEIGHT//2, HEIGHT - 200, HEIGHT - 100]),
+        ("FWD", 450, [HEIGHT//2 - 75, HEIGHT//2 + 75]),
+    ],
+}
+DEFAULT_TEAM = {'formation': "4-3-3", 'speed_range': [0.8, 1.1]}
+
 # Physics constants
 FRICTION = 0.97
 MAX_PLAYER_SPEED = 1.5  # Reduced player speed for easier visualization
 MAX_BALL_SPEED = 5      # Reduced ball speed
 KICK_POWER = 4          # Reduced kick power
 
+# Passing lane settings
+LANE_CACHE_TOLERANCE = 3.0   # Pixels any player may move before lanes are re-scored
+LANE_OPEN_DISTANCE = 60.0    # Opponent distance at which a lane counts as fully open
+LANE_PROGRESS_WEIGHT = 0.5   # Weight of forward progress against lane openness
+PASS_TARGET_ROLES = ("MID", "FWD")  # Roles a player will pass to
+
+# AI level-of-detail settings
+LOD_NEAR_DISTANCE = 150.0    # Players this close to the ball's path re-target every tick
+LOD_LOOKAHEAD = 30           # Ticks of ball travel that count as the ball's path
+LOD_FAR_INTERVAL = 8         # Most ticks a distant player waits between re-targets
+LOD_ACCURACY_BUDGET = 20.0   # Max distance (pixels) a distant player's target may drift from full-rate AI
+
 # Game states
 PLAYING = 0
 OFFSIDE_DETECTED = 1
@@ -71,6 +158,16 @@ offside_player = None
 # Debug mode
 DEBUG = False
 
+# Split view: frozen pass-moment panel next to the live frame
+SPLIT_VIEW = False
+PANEL_WIDTH = WIDTH // 2
+PANEL_HEIGHT = HEIGHT // 2
+PANEL_TOP = HEIGHT - PANEL_HEIGHT - 60  # Below the button column, with room for the labels
+frame_surface = pygame.Surface((WIDTH, HEIGHT))  # Offscreen target for the live frame
+pass_panel = None  # Scaled pass-moment panel, rendered once per pass
+pass_panel_source = None  # The pass_moment the cached panel was rendered from
+reception_panel = None  # Scaled reception panel, rendered once while play is stopped for offside
+
 # For explaining offside
 offside_explanation = [
     "Offside Rule in Football:",
@@ -96,7 +193,7 @@ class Button:
         pygame.draw.rect(screen, BLACK, self.rect, 2)  # Border
         
         # Draw text
-        text_surf = small_font.render(self.text, True, BLACK)
+        text_surf = render_text(small_font, self.text, BLACK)
         text_rect = text_surf.get_rect(center=self.rect.center)
         screen.blit(text_surf, text_rect)
     
@@ -110,9 +207,15 @@ class Button:
                 return self.action()
         return False
 
+# Team colour, with goalkeepers in a different shade
+def player_color(team, role):
+    if role == "GK":
+        return (200, 50, 50) if team == 0 else (50, 50, 200)
+    return RED if team == 0 else BLUE
+
 # Player class with realistic positioning
 class Player:
-    def __init__(self, x, y, team, role, position_id):
+    def __init__(self, x, y, team, role, position_id, speed_range=(0.8, 1.1)):
         self.x = x
         self.y = y
         self.team = team  # 0 = red (left to right), 1 = blue (right to left)
@@ -120,6 +223,8 @@ class Player:
         self.position_id = position_id  # Unique ID for positioning
         self.home_x = x  # Default position to return to
         self.home_y = y
+        self.slot_offset = y - HEIGHT/2  # Place in its formation line, relative to the centre
+        self.striker = False  # The forward who stays up when defending
         self.vx = 0
         self.vy = 0
         self.has_ball = False
@@ -127,20 +232,19 @@ class Player:
         self.target_x = x
         self.target_y = y
         self.attacking = False
-        self.speed = MAX_PLAYER_SPEED * random.uniform(0.8, 1.1)  # Vary player speed
+        self.speed = MAX_PLAYER_SPEED * random.uniform(*speed_range)  # Vary player speed
+        self.prev_x = x  # Position at the start of the current tick
+        self.prev_y = y
         self.highlighted = False  # For offside visualization
 
     def euclidean_distance(self, other_x, other_y):
         """Calculate Euclidean distance to another point"""
         return math.sqrt((self.x - other_x)**2 + (self.y - other_y)**2)
         
-    def move(self, ball, players):
-        global last_kicker, pass_moment, pass_in_progress, receiver
-        
-        # Calculate distances
+    def compute_target(self, ball, players):
+        """Work out where this player wants to be from its role and the ball position"""
         dist_to_ball = self.euclidean_distance(ball.x, ball.y)
         teammates = [p for p in players if p.team == self.team and p != self]
-        opponents = [p for p in players if p.team != self.team]
         
         # Get team with possession
         ball_possessor = next((p for p in players if p.has_ball), None)
@@ -150,8 +254,8 @@ class Player:
         self.attacking = (team_in_possession == self.team) or (team_in_possession is None and ball.x > HALF_WIDTH and self.team == 0) or (team_in_possession is None and ball.x < HALF_WIDTH and self.team == 1)
         
         # Reset target to home position by default
-        self.target_x = self.home_x
-        self.target_y = self.home_y
+        target_x = self.home_x
+        target_y = self.home_y
         
         # Goalkeepers stay near goal
         if self.role == "GK":
@@ -160,14 +264,14 @@ class Player:
             
             # Only come out for the ball if it's close to goal
             if self.team == 0 and ball.x < 120 and 150 < ball.y < HEIGHT - 150:
-                self.target_x = min(120, ball.x)
-                self.target_y = ball.y
+                target_x = min(120, ball.x)
+                target_y = ball.y
             elif self.team == 1 and ball.x > WIDTH - 120 and 150 < ball.y < HEIGHT - 150:
-                self.target_x = max(WIDTH - 120, ball.x)
-                self.target_y = ball.y
+                target_x = max(WIDTH - 120, ball.x)
+                target_y = ball.y
             else:
-                self.target_x = goal_x
-                self.target_y = goal_y
+                target_x = goal_x
+                target_y = goal_y
                 
         # Field players behavior
         else:
@@ -178,8 +282,8 @@ class Player:
             
             # The closest 2 players from each team will chase the ball
             if self == teammates_dist_to_ball[0][0] or self == teammates_dist_to_ball[1][0]:
-                self.target_x = ball.x
-                self.target_y = ball.y
+                target_x = ball.x
+                target_y = ball.y
             
             # Other players maintain formation with strategic positioning
             else:
@@ -188,26 +292,23 @@ class Player:
                     # Defenders stay back but move up a bit
                     if self.role == "DEF":
                         forward_position = 0.3 if self.team == 0 else 0.7
-                        self.target_x = FIELD_WIDTH * forward_position
-                        # Spread out horizontally
-                        spread = (self.position_id - 2) * 100
-                        self.target_y = HEIGHT/2 + spread
+                        target_x = FIELD_WIDTH * forward_position
+                        # Spread out along the formation's back line
+                        target_y = HEIGHT/2 + self.slot_offset
                     
                     # Midfielders move up to support attack
                     elif self.role == "MID":
                         forward_position = 0.6 if self.team == 0 else 0.4
-                        self.target_x = FIELD_WIDTH * forward_position
-                        # Spread out
-                        spread = (self.position_id - 6) * 80
-                        self.target_y = HEIGHT/2 + spread
+                        target_x = FIELD_WIDTH * forward_position
+                        # Spread out along the formation's midfield line
+                        target_y = HEIGHT/2 + self.slot_offset
                     
                     # Forwards move to attacking positions
                     elif self.role == "FWD":
                         forward_position = 0.8 if self.team == 0 else 0.2
-                        self.target_x = FIELD_WIDTH * forward_position
-                        # Spread out
-                        spread = (self.position_id - 9) * 120
-                        self.target_y = HEIGHT/2 + spread
+                        target_x = FIELD_WIDTH * forward_position
+                        # Spread out along the formation's front line
+                        target_y = HEIGHT/2 + self.slot_offset
                 
                 # Defending team gets into defensive shape
                 else:
@@ -217,38 +318,45 @@ class Player:
                     # Defenders form a line in front of goal
                     if self.role == "DEF":
                         back_position = 0.15 if self.team == 0 else 0.85
-                        self.target_x = FIELD_WIDTH * back_position
+                        target_x = FIELD_WIDTH * back_position
                         # Spread defenders to cover width
-                        spread = (self.position_id - 2) * 100
-                        self.target_y = min(max(100, HEIGHT/2 + spread), HEIGHT - 100)
+                        target_y = min(max(100, HEIGHT/2 + self.slot_offset), HEIGHT - 100)
                         
-                        # Adjust based on ball position
-                        if ball.y < self.target_y - 50:
-                            self.target_y -= 50
-                        elif ball.y > self.target_y + 50:
-                            self.target_y += 50
+                        # Shift up to 50 towards the ball once it is more than 50 away,
+                        # ramping in so the target never jumps on a small ball movement
+                        offset = ball.y - target_y
+                        shift = min(50, max(0, abs(offset) - 50))
+                        target_y += shift if offset > 0 else -shift
                     
                     # Midfielders provide defensive cover
                     elif self.role == "MID":
                         mid_position = 0.35 if self.team == 0 else 0.65
-                        self.target_x = FIELD_WIDTH * mid_position
+                        target_x = FIELD_WIDTH * mid_position
                         # Position midfielders between ball and goal
-                        self.target_y = ball.y + (HEIGHT/2 - ball.y) * 0.5
-                        # Add some spread
-                        spread = (self.position_id - 6) * 60
-                        self.target_y += spread
+                        target_y = ball.y + (HEIGHT/2 - ball.y) * 0.5
+                        # Add some spread, tighter than the formation line
+                        target_y += self.slot_offset * 0.4
                         
                     # One forward stays up, others come back
                     elif self.role == "FWD":
-                        if self.position_id == 9:  # Striker stays forward
+                        if self.striker:  # Striker stays forward
                             forward_position = 0.6 if self.team == 0 else 0.4
-                            self.target_x = FIELD_WIDTH * forward_position
-                            self.target_y = HEIGHT/2
+                            target_x = FIELD_WIDTH * forward_position
+                            target_y = HEIGHT/2
                         else:  # Other forwards help midfield
                             mid_position = 0.4 if self.team == 0 else 0.6
-                            self.target_x = FIELD_WIDTH * mid_position
-                            spread = (self.position_id - 9) * 100
-                            self.target_y = HEIGHT/2 + spread
+                            target_x = FIELD_WIDTH * mid_position
+                            target_y = HEIGHT/2 + self.slot_offset * 0.7
+        
+        return target_x, target_y
+
+    def move(self, ball, players):
+        # Remember where this tick started for swept contact tests
+        self.prev_x = self.x
+        self.prev_y = self.y
+        
+        # Pick a target, at a reduced rate for players far from the play
+        self.target_x, self.target_y = ai_scheduler.target_for(self, ball, players)
         
         # Move toward target position
         dx = self.target_x - self.x
@@ -275,9 +383,15 @@ class Player:
         # Keep players within bounds
         self.x = max(10, min(self.x, FIELD_WIDTH - 10))
         self.y = max(10, min(self.y, FIELD_HEIGHT - 10))
+
+    def touch_ball(self, ball, players, touching):
+        """Handle ball interaction once contact for this tick has been resolved"""
+        global last_kicker, pass_moment, pass_in_progress, receiver
+        
+        teammates = [p for p in players if p.team == self.team and p != self]
         
         # Handle ball interaction
-        if dist_to_ball < PLAYER_RADIUS + BALL_RADIUS:
+        if touching:
             # New player touches the ball
             if not self.has_ball:
                 # Check if this is receiving a pass
@@ -303,11 +417,11 @@ class Player:
                     
                     # Decide direction to kick
                     # Find teammates in advantageous positions
-                    available_teammates = [p for p in teammates if p.role in ["MID", "FWD"]]
+                    available_teammates = [p for p in teammates if p.role in PASS_TARGET_ROLES]
                     
                     if available_teammates and random.random() < 0.7:  # 70% chance to pass to teammate
-                        # Pick a good teammate to pass to
-                        pass_target = random.choice(available_teammates)
+                        # Pick the teammate with the most open, most progressive lane
+                        pass_target = passing_lanes.best_target(self, available_teammates)
                         
                         # Calculate kick direction
                         kick_dx = pass_target.x - self.x
@@ -333,7 +447,7 @@ class Player:
                     pass_moment = {
                         'kicker': self,
                         'ball_pos': (ball.x, ball.y),
-                        'player_positions': [(p.x, p.y, p.team) for p in players]
+                        'player_positions': [(p.x, p.y, p.team, p.role, p.position_id) for p in players]
                     }
                     pass_in_progress = True
                     return False, None, None
@@ -358,18 +472,15 @@ class Player:
                 
         return False, None, None
 
-    def draw(self):
-        color = RED if self.team == 0 else BLUE
-        # Make goalkeeper a different shade
-        if self.role == "GK":
-            color = (200, 50, 50) if self.team == 0 else (50, 50, 200)
+    def draw(self, surface):
+        color = player_color(self.team, self.role)
         
         # Draw player circle
-        pygame.draw.circle(screen, color, (int(self.x), int(self.y)), PLAYER_RADIUS)
+        pygame.draw.circle(surface, color, (int(self.x), int(self.y)), PLAYER_RADIUS)
         
         # Add highlight if this player is involved in offside
         if self.highlighted:
-            pygame.draw.circle(screen, YELLOW, (int(self.x), int(self.y)), PLAYER_RADIUS + 5, 2)
+            pygame.draw.circle(surface, YELLOW, (int(self.x), int(self.y)), PLAYER_RADIUS + 5, 2)
             
             # Add label above player
             if self.team == receiver.team:
@@ -377,21 +488,21 @@ class Player:
             else:
                 label = "2nd LAST DEF"
                 
-            label_text = tiny_font.render(label, True, YELLOW)
-            screen.blit(label_text, (self.x - label_text.get_width()//2, self.y - PLAYER_RADIUS - 15))
+            label_text = render_text(tiny_font, label, YELLOW)
+            surface.blit(label_text, (self.x - label_text.get_width()//2, self.y - PLAYER_RADIUS - 15))
         
         # Show team number
-        number_text = small_font.render(str(self.position_id), True, WHITE)
-        screen.blit(number_text, (self.x - number_text.get_width()//2, self.y - number_text.get_height()//2))
+        number_text = render_text(small_font, str(self.position_id), WHITE)
+        surface.blit(number_text, (self.x - number_text.get_width()//2, self.y - number_text.get_height()//2))
         
         # Show indicator if this player has the ball
         if self.has_ball:
-            pygame.draw.circle(screen, WHITE, (int(self.x), int(self.y)), PLAYER_RADIUS + 5, 2)
+            pygame.draw.circle(surface, WHITE, (int(self.x), int(self.y)), PLAYER_RADIUS + 5, 2)
             
         # Debug: Show target position
         if DEBUG:
-            pygame.draw.line(screen, YELLOW, (self.x, self.y), (self.target_x, self.target_y), 1)
-            pygame.draw.circle(screen, YELLOW, (int(self.target_x), int(self.target_y)), 3)
+            pygame.draw.line(surface, YELLOW, (self.x, self.y), (self.target_x, self.target_y), 1)
+            pygame.draw.circle(surface, YELLOW, (int(self.target_x), int(self.target_y)), 3)
 
 # Ball class
 class Ball:
@@ -400,15 +511,17 @@ class Ball:
         self.y = y
         self.vx = 0
         self.vy = 0
-        self.path = []  # Store positions for visualization
         self.max_path_length = 50
+        self.path = deque(maxlen=self.max_path_length)  # Store positions for visualization
+        self.prev_x = x  # Position at the start of the current tick
+        self.prev_y = y
 
     def move(self):
         # Save current position for path visualization
         self.path.append((self.x, self.y))
-        if len(self.path) > self.max_path_length:
-            self.path.pop(0)
             
+        self.prev_x = self.x
+        self.prev_y = self.y
         self.x += self.vx
         self.y += self.vy
         self.vx *= FRICTION
@@ -436,28 +549,324 @@ class Ball:
             
         return False  # No goal
 
+    def goal_line_time(self):
+        """Fraction of this tick at which the ball crossed a goal line, or None"""
+        dx = self.x - self.prev_x
+        if dx == 0:
+            return None
+        if self.x < 0 <= self.prev_x:
+            return -self.prev_x / dx
+        if self.x > FIELD_WIDTH >= self.prev_x:
+            return (FIELD_WIDTH - self.prev_x) / dx
+        return None
+
     def reset(self):
         self.x = FIELD_WIDTH / 2
         self.y = FIELD_HEIGHT / 2
         self.vx = 0
         self.vy = 0
-        self.path = []
+        self.prev_x = self.x
+        self.prev_y = self.y
+        self.path.clear()
 
-    def draw(self):
+    def draw(self, surface):
         # Draw ball path
         for i in range(1, len(self.path)):
             # Fade the path from white to transparent
             alpha = int(255 * (i / len(self.path)))
             color = (255, 255, 255, alpha)
-            pygame.draw.line(screen, color, self.path[i-1], self.path[i], 1)
+            pygame.draw.line(surface, color, self.path[i-1], self.path[i], 1)
         
         # Draw the ball
-        pygame.draw.circle(screen, WHITE, (int(self.x), int(self.y)), BALL_RADIUS)
+        pygame.draw.circle(surface, WHITE, (int(self.x), int(self.y)), BALL_RADIUS)
+
+# Passing lane visibility map, scored lazily per passer and cached until players move
+class PassingLaneMap:
+    def __init__(self, tolerance=LANE_CACHE_TOLERANCE):
+        self.tolerance = tolerance
+        self.snapshot = None  # Player positions the cached rows are valid for
+        self.players = []
+        self.rows = {}  # passer -> {receiver: lane score}
+
+    def update(self, players):
+        """Drop the cached rows if any player moved more than the tolerance since they were valid"""
+        self.players = players
+        positions = [(p.x, p.y) for p in players]
+        if self.snapshot is not None and len(self.snapshot) == len(positions):
+            moved = max(max(abs(x - sx), abs(y - sy))
+                        for (x, y), (sx, sy) in zip(positions, self.snapshot))
+            if moved <= self.tolerance:
+                return False
+
+        self.snapshot = positions
+        self.rows = {}
+        return True
+
+    def row(self, passer):
+        """Lane scores from this passer to every teammate that can be passed to"""
+        scores = self.rows.get(passer)
+        if scores is None:
+            attack_dir = 1 if passer.team == 0 else -1
+            opponents = [(p.x, p.y) for p in self.players if p.team != passer.team]
+            scores = {}
+            for target in self.players:
+                if target.team != passer.team or target is passer or target.role not in PASS_TARGET_ROLES:
+                    continue
+                clearance = lane_clearance(passer.x, passer.y, target.x, target.y, opponents)
+                openness = min(clearance, LANE_OPEN_DISTANCE) / LANE_OPEN_DISTANCE
+                progress = attack_dir * (target.x - passer.x) / FIELD_WIDTH
+                scores[target] = openness + LANE_PROGRESS_WEIGHT * progress
+            self.rows[passer] = scores
+        return scores
+
+    def score(self, passer, target):
+        return self.row(passer).get(target, 0.0)
+
+    def best_target(self, passer, candidates):
+        """Pick the candidate with the highest lane score, falling back to random before the first update"""
+        if not self.players:
+            return random.choice(candidates)
+        scores = self.row(passer)
+        return max(candidates, key=lambda p: scores.get(p, 0.0))
+
+# Level-of-detail scheduler for player AI targets
+class AIScheduler:
+    def __init__(self, near_distance=LOD_NEAR_DISTANCE, far_interval=LOD_FAR_INTERVAL,
+                 accuracy_budget=LOD_ACCURACY_BUDGET, measure_drift=False):
+        self.near_distance = near_distance
+        self.far_interval = far_interval
+        self.accuracy_budget = accuracy_budget
+        self.measure_drift = measure_drift  # Also run full-rate AI to measure how far we drift from it
+        self.tick = 0
+        self.ball_path = None  # Segment the ball will cover over the lookahead
+        self.near_box = None  # Bounding box of the ball path grown by near_distance
+        self.chasers = set()  # The two players per team closest to the ball
+        self.phase = None  # Which team is attacking; a change re-targets everyone
+        self.phase_changed = True
+        self.plans = {}  # player -> [from_x, from_y, to_x, to_y, updated_tick, interval, ball_x, ball_y]
+        self.full_updates = 0
+        self.skipped_updates = 0
+        self.drift_total = 0.0
+        self.drift_max = 0.0
+        self.drift_samples = 0
+
+    def reset(self):
+        self.ball_path = None
+        self.near_box = None
+        self.chasers = set()
+        self.phase = None
+        self.phase_changed = True
+        self.plans = {}
+
+    def begin_tick(self, ball, players):
+        """Advance the scheduler clock and work out where the play is this tick"""
+        self.tick += 1
+        
+        # Drop plans for players that are no longer on the pitch
+        if len(self.plans) > len(players):
+            self.plans = {p: self.plans[p] for p in players if p in self.plans}
+        
+        reach = (1 - FRICTION ** LOD_LOOKAHEAD) / (1 - FRICTION)
+        end_x = ball.x + ball.vx * reach
+        end_y = ball.y + ball.vy * reach
+        self.ball_path = (ball.x, ball.y, end_x, end_y)
+        self.near_box = (min(ball.x, end_x) - self.near_distance, min(ball.y, end_y) - self.near_distance,
+                         max(ball.x, end_x) + self.near_distance, max(ball.y, end_y) + self.near_distance)
+        
+        # Ball chasers' targets follow the ball, so they always run at full rate
+        self.chasers = set()
+        for team in (0, 1):
+            by_distance = sorted((p for p in players if p.team == team and p.role != "GK"),
+                                 key=lambda p: (p.x - ball.x)**2 + (p.y - ball.y)**2)
+            self.chasers.update(by_distance[:2])
+        
+        # Same attacking rule as compute_target; when it flips every target changes at once
+        ball_possessor = next((p for p in players if p.has_ball), None)
+        if ball_possessor:
+            phase = ball_possessor.team
+        else:
+            phase = 0 if ball.x > HALF_WIDTH else 1 if ball.x < HALF_WIDTH else None
+        self.phase_changed = phase != self.phase
+        self.phase = phase
+
+    def is_near_play(self, player):
+        if self.ball_path is None:
+            return True
+        
+        # Cheap bounding box reject before the segment test
+        min_x, min_y, max_x, max_y = self.near_box
+        if not (min_x <= player.x <= max_x and min_y <= player.y <= max_y):
+            return False
+        return lane_clearance(*self.ball_path, [(player.x, player.y)]) < self.near_distance
+
+    def target_for(self, player, ball, players):
+        """Return the player's target, recomputing it only as often as its distance from the play needs"""
+        plan = self.plans.get(player)
+
+        if (plan is None or self.far_interval <= 1 or self.phase_changed or player.role == "GK"
+                or player in self.chasers or self.is_near_play(player)):
+            # Full rate near the play, for keepers (who jump off their line when the ball
+            # enters the box) and whenever the attacking team changes
+            target_x, target_y = player.compute_target(ball, players)
+            plan = [target_x, target_y, target_x, target_y, self.tick, 1, ball.x, ball.y]
+            self.plans[player] = plan
+            self.full_updates += 1
+        elif (self.tick - plan[4] >= plan[5]
+                or (ball.x - plan[6])**2 + (ball.y - plan[7])**2 > (self.accuracy_budget / 2)**2):
+            # Reduced rate: re-target when the interval is up, or sooner once the ball has moved
+            # half the budget. Outfield targets move no faster than the ball, so half the budget
+            # covers the target going stale and the other half covers blending towards it.
+            target_x, target_y = player.compute_target(ball, players)
+            interval = plan[5]
+            jump = math.sqrt((target_x - plan[2])**2 + (target_y - plan[3])**2)
+            if jump > self.accuracy_budget / 2:
+                # Blending across a big jump would exceed the budget, so snap to the new target
+                interval = max(1, interval // 2)
+                plan[:] = [target_x, target_y, target_x, target_y, self.tick, interval, ball.x, ball.y]
+            else:
+                if jump < self.accuracy_budget / 4:
+                    interval = min(self.far_interval, interval * 2)
+                plan[:] = [plan[2], plan[3], target_x, target_y, self.tick, interval, ball.x, ball.y]
+            self.full_updates += 1
+        else:
+            self.skipped_updates += 1
+
+        # Interpolate from the previous target to the new one over the interval
+        from_x, from_y, to_x, to_y, updated, interval, _, _ = plan
+        blend = min(1.0, (self.tick - updated + 1) / interval)
+        lod_x = from_x + (to_x - from_x) * blend
+        lod_y = from_y + (to_y - from_y) * blend
+
+        if self.measure_drift:
+            full_x, full_y = player.compute_target(ball, players)
+            drift = math.sqrt((lod_x - full_x)**2 + (lod_y - full_y)**2)
+            self.drift_total += drift
+            self.drift_max = max(self.drift_max, drift)
+            self.drift_samples += 1
+
+        return lod_x, lod_y
+
+    def report(self):
+        """Summarise how much AI work was skipped and, if measured, the drift from full-rate AI"""
+        total = self.full_updates + self.skipped_updates
+        return {
+            'full_updates': self.full_updates,
+            'skipped_updates': self.skipped_updates,
+            'skip_ratio': self.skipped_updates / total if total else 0.0,
+            'mean_drift': self.drift_total / self.drift_samples if self.drift_samples else None,
+            'max_drift': self.drift_max if self.drift_samples else None,
+        }
+
+# Swept circle-vs-circle test: fraction of the tick (0..1) at which two moving circles first touch
+def swept_contact(ax0, ay0, ax1, ay1, bx0, by0, bx1, by1, radius):
+    # Work relative to B so only A moves
+    dx = ax0 - bx0
+    dy = ay0 - by0
+    mx = (ax1 - ax0) - (bx1 - bx0)
+    my = (ay1 - ay0) - (by1 - by0)
+    
+    c = dx * dx + dy * dy - radius * radius
+    if c <= 0:
+        return 0.0  # Already touching at the start of the tick
+    
+    a = mx * mx + my * my
+    b = 2 * (dx * mx + dy * my)
+    if a == 0 or b >= 0:
+        return None  # Not moving relative to each other, or moving apart
+    
+    disc = b * b - 4 * a * c
+    if disc < 0:
+        return None  # Closest approach stays outside the radius
+    
+    t = (-b - math.sqrt(disc)) / (2 * a)
+    return t if t <= 1 else None
+
+# Find the first player the ball touched during this tick
+def first_contact(ball, players):
+    """Return (time of impact, player) for the earliest ball contact this tick, or (None, None)"""
+    best_key, contact_time, contact_player = None, None, None
+    for player in players:
+        t = swept_contact(ball.prev_x, ball.prev_y, ball.x, ball.y,
+                          player.prev_x, player.prev_y, player.x, player.y,
+                          PLAYER_RADIUS + BALL_RADIUS)
+        if t is None:
+            continue
+        
+        # Ties (usually several players already touching at t == 0) go to whoever was
+        # closest to the ball, not whoever comes first in the list
+        start_dist_sq = (player.prev_x - ball.prev_x)**2 + (player.prev_y - ball.prev_y)**2
+        key = (t, start_dist_sq)
+        if best_key is None or key < best_key:
+            best_key, contact_time, contact_player = key, t, player
+    return contact_time, contact_player
+
+# Resolve ball contact after everyone has moved
+def resolve_ball_contact(ball, players, goal_time=None):
+    """Hand the ball to whoever touched it first; goal_time is when it crossed a goal line this tick"""
+    contact_time, contact_player = first_contact(ball, players)
+    
+    # A touch after the ball crossed the line is too late to stop the goal
+    if contact_player and goal_time is not None and contact_time >= goal_time:
+        contact_time, contact_player = None, None
+    
+    # Stop the ball where it met the player rather than where it ended the tick
+    if contact_player and (contact_time > 0 or goal_time is not None):
+        ball.x = ball.prev_x + (ball.x - ball.prev_x) * contact_time
+        ball.y = ball.prev_y + (ball.y - ball.prev_y) * contact_time
+        
+        # A goal-bound ball is blocked dead rather than left heading out of play
+        if goal_time is not None:
+            ball.vx = 0
+            ball.vy = 0
+    
+    offside_result = (False, None, None)
+    for player in players:
+        result = player.touch_ball(ball, players, player is contact_player)
+        if result[0]:
+            offside_result = result
+    return offside_result
+
+# Distance from the pass segment (px, py) -> (tx, ty) to the nearest opponent
+def lane_clearance(px, py, tx, ty, opponents):
+    seg_x = tx - px
+    seg_y = ty - py
+    seg_len_sq = seg_x * seg_x + seg_y * seg_y
+    nearest_sq = float('inf')
+
+    for ox, oy in opponents:
+        # Project the opponent onto the segment and clamp to its end points
+        if seg_len_sq > 0:
+            t = ((ox - px) * seg_x + (oy - py) * seg_y) / seg_len_sq
+            t = max(0.0, min(1.0, t))
+        else:
+            t = 0.0
+        dx = px + t * seg_x - ox
+        dy = py + t * seg_y - oy
+        dist_sq = dx * dx + dy * dy
+        if dist_sq < nearest_sq:
+            nearest_sq = dist_sq
+
+    return math.sqrt(nearest_sq)
+
+# Second-last defender in the positions recorded when the ball was played
+def second_last_defender_at_pass(pass_data):
+    """Return the (x, y, team, role, position_id) snapshot entry of the second-last defender"""
+    attacking_team = pass_data['kicker'].team
+    defenders = [entry for entry in pass_data['player_positions'] if entry[2] != attacking_team]
+    if len(defenders) < 2:
+        return None
+    
+    # Sort defenders from their own goal line outwards (last defender is usually the goalkeeper)
+    if attacking_team == 0:  # Red team attacking left to right, blue goal line at x = WIDTH
+        defenders.sort(key=lambda entry: -entry[0])
+    else:  # Blue team attacking right to left, red goal line at x = 0
+        defenders.sort(key=lambda entry: entry[0])
+    return defenders[1]
 
 # Function to check offside using Euclidean distance
 def check_offside(pass_data, receiving_player):
     """
-    Check if the receiving player is in an offside position at the moment the ball is played.
+    Check if the receiving player was in an offside position at the moment the ball was played.
     """
     if not pass_data:
         return False, None, None
@@ -465,39 +874,37 @@ def check_offside(pass_data, receiving_player):
     attacking_team = pass_data['kicker'].team
     ball_x, ball_y = pass_data['ball_pos']
     
-    # Get all defenders from the opposing team (including the goalkeeper)
-    defenders = [p for p in players if p.team != attacking_team]
-    
-    # Sort defenders by their x-coordinate (closest to the goal)
-    if attacking_team == 0:  # Red team attacking left to right
-        defenders.sort(key=lambda p: p.x)  # Sort by x ascending
-    else:  # Blue team attacking right to left
-        defenders.sort(key=lambda p: -p.x)  # Sort by x descending
-    
-    # The second-last defender is the offside line (last defender is usually the goalkeeper)
-    if len(defenders) < 2:
+    # The second-last defender at the pass sets the offside line
+    defender_entry = second_last_defender_at_pass(pass_data)
+    if defender_entry is None:
         return False, None, None  # Not enough defenders
+    line_x = defender_entry[0]
+    second_last_defender = next(p for p in players
+                                if p.team == defender_entry[2] and p.position_id == defender_entry[4])
     
-    second_last_defender = defenders[1]
+    # Judge the receiver where they stood when the ball was played, not where they received it
+    receiver_x = next((x for x, _, team, _, position_id in pass_data['player_positions']
+                       if team == receiving_player.team and position_id == receiving_player.position_id),
+                      receiving_player.x)
     
     # Offside conditions:
     # 1. Player is in the opponent's half
-    in_opponent_half = (attacking_team == 0 and receiving_player.x > HALF_WIDTH) or \
-                       (attacking_team == 1 and receiving_player.x < HALF_WIDTH)
+    in_opponent_half = (attacking_team == 0 and receiver_x > HALF_WIDTH) or \
+                       (attacking_team == 1 and receiver_x < HALF_WIDTH)
     
     if not in_opponent_half:
         return False, None, None  # Player is in their own half, cannot be offside
     
     # 2. Player is closer to the opponent's goal line than the second-last defender
-    ahead_of_defender = (attacking_team == 0 and receiving_player.x > second_last_defender.x) or \
-                        (attacking_team == 1 and receiving_player.x < second_last_defender.x)
+    ahead_of_defender = (attacking_team == 0 and receiver_x > line_x) or \
+                        (attacking_team == 1 and receiver_x < line_x)
     
     if not ahead_of_defender:
         return False, None, None  # Player is not ahead of the second-last defender
     
     # 3. Player is closer to the opponent's goal line than the ball at the moment of the pass
-    ahead_of_ball = (attacking_team == 0 and receiving_player.x > ball_x) or \
-                    (attacking_team == 1 and receiving_player.x < ball_x)
+    ahead_of_ball = (attacking_team == 0 and receiver_x > ball_x) or \
+                    (attacking_team == 1 and receiver_x < ball_x)
     
     if not ahead_of_ball:
         return False, None, None  # Player is not ahead of the ball
@@ -505,109 +912,117 @@ def check_offside(pass_data, receiving_player):
     # Player is offside if all conditions are met
     return True, second_last_defender, receiving_player
 
+# A team config's outfield lines: inline 'lines' if given, otherwise a named formation
+def formation_lines(config):
+    if 'lines' in config:
+        return config['lines']
+    return FORMATIONS[config['formation']]
+
+# Check a team config and fill in defaults, raising ValueError with a readable message
+def normalise_team_config(name, config):
+    if not isinstance(config, dict):
+        raise ValueError(f"team {name!r}: config must be an object, got {type(config).__name__}")
+    
+    if 'lines' in config:
+        lines = config['lines']
+    elif config.get('formation') in FORMATIONS:
+        lines = FORMATIONS[config['formation']]
+    elif 'formation' in config:
+        raise ValueError(f"team {name!r}: unknown formation {config['formation']!r}; use one of "
+                         f"{', '.join(FORMATIONS)} or give its 'lines' inline")
+    else:
+        raise ValueError(f"team {name!r}: needs a 'formation' name or inline 'lines'")
+    
+    # Lines are [role, x, [y, ...]] from the team's own goal outwards
+    outfield = 0
+    for line in lines:
+        if not (isinstance(line, (list, tuple)) and len(line) == 3):
+            raise ValueError(f"team {name!r}: each line must be [role, x, [y, ...]], got {line!r}")
+        role, x, ys = line
+        if role not in ("DEF", "MID", "FWD"):
+            raise ValueError(f"team {name!r}: line role must be DEF, MID or FWD, got {role!r}")
+        if not (isinstance(x, (int, float)) and 0 < x < WIDTH):
+            raise ValueError(f"team {name!r}: {role} line x must be on the pitch, got {x!r}")
+        if not (isinstance(ys, (list, tuple)) and ys
+                and all(isinstance(y, (int, float)) and 0 < y < HEIGHT for y in ys)):
+            raise ValueError(f"team {name!r}: {role} line y positions must be on the pitch, got {ys!r}")
+        outfield += len(ys)
+    if outfield != PLAYERS_PER_TEAM - 1:
+        raise ValueError(f"team {name!r}: lines place {outfield} outfield players, "
+                         f"expected {PLAYERS_PER_TEAM - 1}")
+    
+    speed_range = config.get('speed_range', DEFAULT_TEAM['speed_range'])
+    if not (isinstance(speed_range, (list, tuple)) and len(speed_range) == 2
+            and all(isinstance(v, (int, float)) for v in speed_range)
+            and 0 < speed_range[0] <= speed_range[1]):
+        raise ValueError(f"team {name!r}: speed_range must be [low, high] with 0 < low <= high, "
+                         f"got {speed_range!r}")
+    
+    return {'lines': [[role, x, list(ys)] for role, x, ys in lines], 'speed_range': list(speed_range)}
+
 # Create teams with specific formations
-def create_teams():
+def create_teams(red=DEFAULT_TEAM, blue=DEFAULT_TEAM):
     players = []
     
-    # Team 0 (Red) - attacking left to right
-    # Goalkeeper (position 1)
-    players.append(Player(50, HEIGHT//2, 0, "GK", 1))
-    
-    # Defenders (positions 2-5)
-    positions = [
-        (150, 150),  # Left back
-        (150, HEIGHT//2 - 75),  # Center back 1
-        (150, HEIGHT//2 + 75),  # Center back 2
-        (150, HEIGHT - 150)   # Right back
-    ]
-    for i, (x, y) in enumerate(positions):
-        players.append(Player(x, y, 0, "DEF", i+2))
-    
-    # Midfielders (positions 6-8)
-    positions = [
-        (300, 150),  # Left mid
-        (300, HEIGHT//2),  # Center mid
-        (300, HEIGHT - 150)  # Right mid
-    ]
-    for i, (x, y) in enumerate(positions):
-        players.append(Player(x, y, 0, "MID", i+6))
-    
-    # Forwards (positions 9-11)
-    positions = [
-        (450, 150),  # Left forward
-        (450, HEIGHT//2),  # Center forward
-        (450, HEIGHT - 150)  # Right forward
-    ]
-    for i, (x, y) in enumerate(positions):
-        players.append(Player(x, y, 0, "FWD", i+9))
-    
-    # Team 1 (Blue) - attacking right to left
-    # Goalkeeper (position 1)
-    players.append(Player(WIDTH-50, HEIGHT//2, 1, "GK", 1))
-    
-    # Defenders (positions 2-5)
-    positions = [
-        (WIDTH - 150, 150),  # Left back
-        (WIDTH - 150, HEIGHT//2 - 75),  # Center back 1
-        (WIDTH - 150, HEIGHT//2 + 75),  # Center back 2
-        (WIDTH - 150, HEIGHT - 150)   # Right back
-    ]
-    for i, (x, y) in enumerate(positions):
-        players.append(Player(x, y, 1, "DEF", i+2))
-    
-    # Midfielders (positions 6-8)
-    positions = [
-        (WIDTH - 300, 150),  # Left mid
-        (WIDTH - 300, HEIGHT//2),  # Center mid
-        (WIDTH - 300, HEIGHT - 150)  # Right mid
-    ]
-    for i, (x, y) in enumerate(positions):
-        players.append(Player(x, y, 1, "MID", i+6))
-    
-    # Forwards (positions 9-11)
-    positions = [
-        (WIDTH - 450, 150),  # Left forward
-        (WIDTH - 450, HEIGHT//2),  # Center forward
-        (WIDTH - 450, HEIGHT - 150)  # Right forward
-    ]
-    for i, (x, y) in enumerate(positions):
-        players.append(Player(x, y, 1, "FWD", i+9))
+    # Team 0 (Red) attacks left to right, team 1 (Blue) right to left
+    for team, config in enumerate((red, blue)):
+        speed_range = config.get('speed_range', DEFAULT_TEAM['speed_range'])
+        
+        def place(x):
+            return x if team == 0 else WIDTH - x
+        
+        # Goalkeeper (position 1)
+        players.append(Player(place(50), HEIGHT//2, team, "GK", 1, speed_range))
+        
+        # Outfield lines, numbered from 2 going forward
+        position_id = 2
+        forwards = []
+        for role, x, ys in formation_lines(config):
+            line = [Player(place(x), y, team, role, position_id + i, speed_range) for i, y in enumerate(ys)]
+            position_id += len(line)
+            players.extend(line)
+            if role == "FWD":
+                forwards.extend(line)
+        
+        # The most central forward is the striker
+        if forwards:
+            min(forwards, key=lambda p: abs(p.slot_offset)).striker = True
     
     return players
 
 # Draw field markings
-def draw_field():
+def draw_field(surface):
     # Field background
-    pygame.draw.rect(screen, LIGHT_GREEN, (0, 0, WIDTH, HEIGHT))
+    pygame.draw.rect(surface, LIGHT_GREEN, (0, 0, WIDTH, HEIGHT))
     
     # Center line
-    pygame.draw.line(screen, WHITE, (HALF_WIDTH, 0), (HALF_WIDTH, HEIGHT), 2)
+    pygame.draw.line(surface, WHITE, (HALF_WIDTH, 0), (HALF_WIDTH, HEIGHT), 2)
     
     # Center circle
-    pygame.draw.circle(screen, WHITE, (HALF_WIDTH, HEIGHT // 2), 70, 2)
-    pygame.draw.circle(screen, WHITE, (HALF_WIDTH, HEIGHT // 2), 5, 0)
+    pygame.draw.circle(surface, WHITE, (HALF_WIDTH, HEIGHT // 2), 70, 2)
+    pygame.draw.circle(surface, WHITE, (HALF_WIDTH, HEIGHT // 2), 5, 0)
     
     # Penalty areas
-    pygame.draw.rect(screen, WHITE, (0, HEIGHT//2 - 150, 100, 300), 2)  # Left penalty area
-    pygame.draw.rect(screen, WHITE, (WIDTH-100, HEIGHT//2 - 150, 100, 300), 2)  # Right penalty area
+    pygame.draw.rect(surface, WHITE, (0, HEIGHT//2 - 150, 100, 300), 2)  # Left penalty area
+    pygame.draw.rect(surface, WHITE, (WIDTH-100, HEIGHT//2 - 150, 100, 300), 2)  # Right penalty area
     
     # Goal areas
-    pygame.draw.rect(screen, WHITE, (0, HEIGHT//2 - 50, 50, 100), 2)  # Left goal area
-    pygame.draw.rect(screen, WHITE, (WIDTH-50, HEIGHT//2 - 50, 50, 100), 2)  # Right goal area
+    pygame.draw.rect(surface, WHITE, (0, HEIGHT//2 - 50, 50, 100), 2)  # Left goal area
+    pygame.draw.rect(surface, WHITE, (WIDTH-50, HEIGHT//2 - 50, 50, 100), 2)  # Right goal area
     
     # Penalty spots
-    pygame.draw.circle(screen, WHITE, (80, HEIGHT//2), 3, 0)  # Left penalty spot
-    pygame.draw.circle(screen, WHITE, (WIDTH-80, HEIGHT//2), 3, 0)  # Right penalty spot
+    pygame.draw.circle(surface, WHITE, (80, HEIGHT//2), 3, 0)  # Left penalty spot
+    pygame.draw.circle(surface, WHITE, (WIDTH-80, HEIGHT//2), 3, 0)  # Right penalty spot
     
     # Corner arcs
-    pygame.draw.arc(screen, WHITE, (-10, -10, 20, 20), 0, math.pi/2, 2)  # Top-left
-    pygame.draw.arc(screen, WHITE, (WIDTH-10, -10, 20, 20), math.pi/2, math.pi, 2)  # Top-right
-    pygame.draw.arc(screen, WHITE, (-10, HEIGHT-10, 20, 20), 3*math.pi/2, 2*math.pi, 2)  # Bottom-left
-    pygame.draw.arc(screen, WHITE, (WIDTH-10, HEIGHT-10, 20, 20), math.pi, 3*math.pi/2, 2)  # Bottom-right
+    pygame.draw.arc(surface, WHITE, (-10, -10, 20, 20), 0, math.pi/2, 2)  # Top-left
+    pygame.draw.arc(surface, WHITE, (WIDTH-10, -10, 20, 20), math.pi/2, math.pi, 2)  # Top-right
+    pygame.draw.arc(surface, WHITE, (-10, HEIGHT-10, 20, 20), 3*math.pi/2, 2*math.pi, 2)  # Bottom-left
+    pygame.draw.arc(surface, WHITE, (WIDTH-10, HEIGHT-10, 20, 20), math.pi, 3*math.pi/2, 2)  # Bottom-right
     
     # Goals
-    pygame.draw.rect(screen, WHITE, (0, GOAL_TOP, GOAL_WIDTH, GOAL_HEIGHT), 2)  # Left goal
-    pygame.draw.rect(screen, WHITE, (FIELD_WIDTH - GOAL_WIDTH, GOAL_TOP, GOAL_WIDTH, GOAL_HEIGHT), 2)  # Right goal
+    pygame.draw.rect(surface, WHITE, (0, GOAL_TOP, GOAL_WIDTH, GOAL_HEIGHT), 2)  # Left goal
+    pygame.draw.rect(surface, WHITE, (FIELD_WIDTH - GOAL_WIDTH, GOAL_TOP, GOAL_WIDTH, GOAL_HEIGHT), 2)  # Right goal
 
 # Function to manually create offside scenario
 def setup_offside_scenario(players, ball):
@@ -647,7 +1062,7 @@ def setup_offside_scenario(players, ball):
 
 # Function to restart the entire game
 def restart_game():
-    global current_state, score_team_red, score_team_blue, pass_in_progress
+    global current_state, score_team_red, score_team_blue, pass_in_progress, reception_panel
     global last_kicker, pass_moment, receiver, offside_line_x, second_last_defender, offside_player
     
     # Reset game state
@@ -659,9 +1074,11 @@ def restart_game():
     offside_line_x = None  # Reset offside line variable
     second_last_defender = None
     offside_player = None
+    reception_panel = None
     
     # Reset ball
     ball.reset()
+    ai_scheduler.reset()
     
     # Reset players to their home positions
     for player in players:
@@ -677,11 +1094,13 @@ def restart_game():
 # Function to reset after offside call
 def reset_after_offside():
     global current_state, pass_in_progress, offside_line_x, second_last_defender, offside_player
+    global last_kicker, pass_moment, receiver, reception_panel
     
     # Reset game state but keep score
     current_state = PLAYING
     pass_in_progress = False
     offside_line_x = None
+    reception_panel = None
     
     # Reset player highlights
     if second_last_defender:
@@ -689,48 +1108,130 @@ def reset_after_offside():
     if offside_player:
         offside_player.highlighted = False
     
+    # Indirect free kick to the defending side, taken by the second-last defender
+    for player in players:
+        player.has_ball = False
+    if second_last_defender:
+        ball.x = second_last_defender.x
+        ball.y = second_last_defender.y
+        last_kicker = second_last_defender
+        
+        # Play it upfield, away from the attackers who were just caught offside
+        attack_dir = 1 if second_last_defender.team == 0 else -1
+        ball.vx = attack_dir * KICK_POWER
+        ball.vy = 0
+    else:
+        ball.vx = 0
+        ball.vy = 0
+    
+    # The offside pass is over; nothing from it carries into the restart
+    pass_moment = None
+    receiver = None
     second_last_defender = None
     offside_player = None
     
-    # Place ball for indirect free kick
-    if receiver:
-        ball.x = receiver.x
-        ball.y = receiver.y
-    
-    ball.vx = 0
-    ball.vy = 0
-    
+    return True
+
+# Function to toggle the split pass/reception view
+def toggle_split_view():
+    global SPLIT_VIEW
+    SPLIT_VIEW = not SPLIT_VIEW
     return True
 
 # Function to toggle debug mode
 def toggle_debug():
-    global DEBUG
+    global DEBUG, reception_panel
     DEBUG = not DEBUG
+    reception_panel = None  # Debug markers change how the frozen reception looks
     return True
 
 # Draw offside visualization
-def draw_offside_visualization():
+def draw_offside_visualization(surface):
     if offside_line_x is not None and second_last_defender and offside_player:
-        # Draw offside line at the ball's position when the pass was made
-        pygame.draw.line(screen, YELLOW, (offside_line_x, 0), (offside_line_x, HEIGHT), 2)
+        # Draw offside line at the second-last defender as they stood when the ball was played
+        pygame.draw.line(surface, YELLOW, (offside_line_x, 0), (offside_line_x, HEIGHT), 2)
         
         # Add text explanation
-        offside_text = font.render("OFFSIDE!", True, YELLOW)
-        screen.blit(offside_text, (WIDTH//2 - offside_text.get_width()//2, 20))
+        offside_text = render_text(font, "OFFSIDE!", YELLOW)
+        surface.blit(offside_text, (WIDTH//2 - offside_text.get_width()//2, 20))
         
         # Draw lines connecting the relevant players
-        pygame.draw.line(screen, YELLOW, (offside_player.x, offside_player.y), 
+        pygame.draw.line(surface, YELLOW, (offside_player.x, offside_player.y), 
                         (offside_player.x, HEIGHT//2), 2)
-        pygame.draw.line(screen, YELLOW, (second_last_defender.x, second_last_defender.y), 
+        pygame.draw.line(surface, YELLOW, (second_last_defender.x, second_last_defender.y), 
                         (second_last_defender.x, HEIGHT//2), 2)
         
         # Add explanation
-        instruction_text = small_font.render("Click 'Reset Play' to continue", True, WHITE)
-        screen.blit(instruction_text, (WIDTH//2 - instruction_text.get_width()//2, 60))
+        instruction_text = render_text(small_font, "Click 'Reset Play' to continue", WHITE)
+        surface.blit(instruction_text, (WIDTH//2 - instruction_text.get_width()//2, 60))
+
+# Stop play and show why the receiver was offside
+def call_offside(offside_result):
+    global current_state, offside_line_x, second_last_defender, offside_player, reception_panel
+    
+    reception_panel = None
+    _, second_last_defender, offside_player = offside_result
+    offside_line_x = offside_line_at_pass(pass_moment)
+    second_last_defender.highlighted = True
+    offside_player.highlighted = True
+    current_state = OFFSIDE_DETECTED
+
+# Offside line from the positions recorded when the ball was played
+def offside_line_at_pass(pass_data):
+    defender_entry = second_last_defender_at_pass(pass_data)
+    return defender_entry[0] if defender_entry else None
+
+# Draw the field as it was at the moment of the pass
+def draw_pass_snapshot(surface, pass_data):
+    draw_field(surface)
+    
+    line_x = offside_line_at_pass(pass_data)
+    if line_x is not None:
+        pygame.draw.line(surface, YELLOW, (line_x, 0), (line_x, HEIGHT), 2)
+    
+    for x, y, team, role, position_id in pass_data['player_positions']:
+        pygame.draw.circle(surface, player_color(team, role), (int(x), int(y)), PLAYER_RADIUS)
+        number_text = render_text(small_font, str(position_id), WHITE)
+        surface.blit(number_text, (x - number_text.get_width()//2, y - number_text.get_height()//2))
+    
+    # Mark the passer and where the ball was played from
+    kicker = pass_data['kicker']
+    ball_x, ball_y = pass_data['ball_pos']
+    pygame.draw.circle(surface, WHITE, (int(ball_x), int(ball_y)), BALL_RADIUS)
+    for x, y, team, _, position_id in pass_data['player_positions']:
+        if team == kicker.team and position_id == kicker.position_id:
+            pygame.draw.circle(surface, WHITE, (int(x), int(y)), PLAYER_RADIUS + 5, 2)
+
+# Scaled live panel; frozen and rendered only once while play is stopped for offside
+def get_reception_panel():
+    global reception_panel
+    
+    if current_state != OFFSIDE_DETECTED:
+        draw_pitch(frame_surface)
+        return pygame.transform.smoothscale(frame_surface, (PANEL_WIDTH, PANEL_HEIGHT))
+    
+    if reception_panel is None:
+        draw_pitch(frame_surface)
+        reception_panel = pygame.transform.smoothscale(frame_surface, (PANEL_WIDTH, PANEL_HEIGHT))
+    return reception_panel
+
+# Scaled pass-moment panel, only rendered again when a new pass is made
+def get_pass_panel():
+    global pass_panel, pass_panel_source
+    
+    if pass_panel is None or pass_panel_source is not pass_moment:
+        draw_pass_snapshot(frame_surface, pass_moment)
+        pass_panel = pygame.transform.smoothscale(frame_surface, (PANEL_WIDTH, PANEL_HEIGHT))
+        pass_panel_source = pass_moment
+    return pass_panel
 
 # Initialize the game
 ball = Ball(WIDTH/2, HEIGHT/2)
 players = create_teams()
+passing_lanes = PassingLaneMap()
+lod_budget = args.lod_budget if args.lod_budget is not None else LOD_ACCURACY_BUDGET
+ai_scheduler = AIScheduler(accuracy_budget=lod_budget,
+                           measure_drift=args.lod_drift)
 
 # UI Buttons for interactive controls
 restart_button = Button(WIDTH - 150, 20, 120, 30, "Restart Game", ORANGE , (255, 200, 0), 
@@ -739,52 +1240,385 @@ reset_button = Button(WIDTH - 150, 60, 120, 30, "Reset Play", ORANGE, (255, 200,
                     lambda: reset_after_offside())
 debug_button = Button(WIDTH - 150, 100, 120, 30, "Debug Mode", ORANGE, (255, 200, 0), 
                     lambda: toggle_debug())
+split_button = Button(WIDTH - 150, 140, 120, 30, "Split View", ORANGE, (255, 200, 0), 
+                    lambda: toggle_split_view())
 
-# Main game loop
-running = True
-while running:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-            
-        # Check button events
-        restart_button.handle_event(event)
-        reset_button.handle_event(event)
-        debug_button.handle_event(event)
-
-    # Game logic
-    if current_state == PLAYING:
-        ball_moved = ball.move()
-        for player in players:
-            player.move(ball, players)
-            if ball_moved:
-                if ball_moved:  # Check if a goal was scored
-                    if ball.x < GOAL_WIDTH:  # Red team goal
-                        score_team_blue += 1
-                        current_state = GOAL_SCORED
-                    elif ball.x > FIELD_WIDTH - GOAL_WIDTH:  # Blue team goal
-                        score_team_red += 1
-                        current_state = GOAL_SCORED
-
-    # Drawing
-    draw_field()
+# Advance the game by one tick
+def step_simulation():
+    global current_state, score_team_red, score_team_blue
+    
+    if current_state != PLAYING:
+        return
+    
+    ball_moved = ball.move()
+    goal_time = ball.goal_line_time() if ball_moved else None
+    passing_lanes.update(players)
+    ai_scheduler.begin_tick(ball, players)
+    for player in players:
+        player.move(ball, players)
+    offside_result = resolve_ball_contact(ball, players, goal_time)
+    if offside_result[0]:
+        call_offside(offside_result)
+    elif ball_moved:  # Check if a goal was scored, unless a player got to the ball first
+        if ball.x < 0:  # Red team goal
+            score_team_blue += 1
+            current_state = GOAL_SCORED
+        elif ball.x > FIELD_WIDTH:  # Blue team goal
+            score_team_red += 1
+            current_state = GOAL_SCORED
+
+# Draw the live pitch onto a surface
+def draw_pitch(surface):
+    draw_field(surface)
     for player in players:
-        player.draw()
-    ball.draw()
+        player.draw(surface)
+    ball.draw(surface)
     
     # Draw offside visualization if applicable
-    draw_offside_visualization()
+    draw_offside_visualization(surface)
+
+# Draw the whole frame to the screen surface
+def draw_frame():
+    if SPLIT_VIEW and pass_moment:
+        # Frozen pass moment on the left, live play scaled down on the right
+        screen.fill(BLACK)
+        screen.blit(get_pass_panel(), (0, PANEL_TOP))
+        screen.blit(get_reception_panel(), (PANEL_WIDTH, PANEL_TOP))
+        
+        pass_label = render_text(small_font, "At the pass", WHITE)
+        screen.blit(pass_label, (PANEL_WIDTH // 2 - pass_label.get_width() // 2, PANEL_TOP - 25))
+        live_label = render_text(small_font, "At the reception" if current_state == OFFSIDE_DETECTED else "Live", WHITE)
+        screen.blit(live_label, (PANEL_WIDTH + PANEL_WIDTH // 2 - live_label.get_width() // 2, PANEL_TOP - 25))
+    else:
+        draw_pitch(screen)
     
     # Draw scores
-    score_text = font.render(f"Red: {score_team_red} - Blue: {score_team_blue}", True, BLACK)
+    score_color = WHITE if SPLIT_VIEW and pass_moment else BLACK
+    score_text = render_text(font, f"Red: {score_team_red} - Blue: {score_team_blue}", score_color)
     screen.blit(score_text, (WIDTH // 2 - score_text.get_width() // 2, 10))
     
     # Draw buttons
     restart_button.draw()
     reset_button.draw()
     debug_button.draw()
+    split_button.draw()
+
+# Resident memory of this process in MB, or None where /proc isn't available
+def current_rss_mb():
+    try:
+        with open("/proc/self/statm") as statm:
+            resident_pages = int(statm.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+# Record one soak sample from the tick latencies since the last one
+def take_soak_sample(started, tick_times):
+    tick_times = sorted(tick_times)
+    
+    def percentile_ms(q):
+        if not tick_times:
+            return 0.0
+        return tick_times[min(len(tick_times) - 1, int(q * len(tick_times)))] * 1000
+    
+    tracked = gc.get_objects()
+    return {
+        'elapsed_min': (time.monotonic() - started) / 60,
+        'rss_mb': current_rss_mb(),
+        'gc_objects': len(tracked),
+        'players': sum(1 for o in tracked if isinstance(o, Player)),
+        'ball_path': len(ball.path),
+        'text_cache': len(text_cache),
+        'text_renders': text_renders,
+        'ai_plans': len(ai_scheduler.plans),
+        'ai_skip_ratio': ai_scheduler.report()['skip_ratio'],
+        'ticks': len(tick_times),
+        'p50_ms': percentile_ms(0.50),
+        'p95_ms': percentile_ms(0.95),
+        'p99_ms': percentile_ms(0.99),
+    }
+
+def print_soak_sample(sample):
+    print(" ".join(f"{key}={value:.2f}" if isinstance(value, float) else f"{key}={value}"
+                   for key, value in sample.items()), flush=True)
+
+# Compare the first and last samples and flag anything that kept growing
+def print_soak_report(samples):
+    if len(samples) < 2:
+        print("Soak too short to measure growth")
+        return
+    
+    first, middle, last = samples[0], samples[len(samples) // 2], samples[-1]
+    print("Soak growth over {:.1f} minutes:".format(last['elapsed_min']))
+    for key in first:
+        # Skip the clock, per-window counts and cumulative ratios; they aren't resources
+        if key in ('elapsed_min', 'ticks', 'ai_skip_ratio') or first[key] is None:
+            continue
+        growth = last[key] - first[key]
+        # Growth in both halves of the run means it hasn't levelled off
+        still_growing = last[key] > middle[key] > first[key]
+        flag = "  <-- still growing" if still_growing else ""
+        print(f"  {key:>12}: {first[key]:10.2f} -> {last[key]:10.2f} ({growth:+.2f}){flag}")
+
+# Headless long-running mode for kiosks: play unattended and track resource growth
+def run_soak(hours, sample_seconds=SOAK_SAMPLE_SECONDS):
+    started = time.monotonic()
+    end_time = started + hours * 3600
+    next_sample = started + sample_seconds
+    samples = []
+    tick_times = []
+    
+    while True:
+        pygame.event.pump()
+        tick_start = time.perf_counter()
+        step_simulation()
+        draw_frame()
+        tick_times.append(time.perf_counter() - tick_start)
+        
+        # Keep the match going with nobody to click the buttons
+        if current_state == OFFSIDE_DETECTED:
+            reset_after_offside()
+        elif current_state != PLAYING:
+            restart_game()
+        
+        now = time.monotonic()
+        if now >= next_sample or now >= end_time:
+            samples.append(take_soak_sample(started, tick_times))
+            print_soak_sample(samples[-1])
+            tick_times = []
+            next_sample = now + sample_seconds
+            if now >= end_time:
+                break
+    
+    print_soak_report(samples)
+    
+    ai_report = ai_scheduler.report()
+    print(f"AI level of detail: {ai_report['skip_ratio']:.1%} of target updates skipped"
+          f" (budget {ai_scheduler.accuracy_budget:.1f} px)")
+    if ai_report['mean_drift'] is not None:
+        print(f"  drift from full-rate AI: mean {ai_report['mean_drift']:.2f} px,"
+              f" max {ai_report['max_drift']:.2f} px")
+    return samples
+
+# Season settings
+ENGINE_VERSION = 3  # Bump whenever simulation code changes behaviour, to invalidate cached results
+SEASON_TEAMS = {
+    "4-3-3": {'formation': "4-3-3", 'speed_range': [0.8, 1.1]},
+    "4-3-3 quick": {'formation': "4-3-3", 'speed_range': [0.95, 1.25]},
+    "4-4-2": {'formation': "4-4-2", 'speed_range': [0.8, 1.1]},
+    "3-5-2": {'formation': "3-5-2", 'speed_range': [0.8, 1.1]},
+}
+
+# Play one headless match and return the score and offside counts
+def simulate_match(fixture):
+    global players, passing_lanes, ai_scheduler, score_team_red, score_team_blue
+    
+    random.seed(fixture['seed'])
+    players = create_teams(fixture['home_config'], fixture['away_config'])
+    passing_lanes = PassingLaneMap()
+    ai_scheduler = AIScheduler(accuracy_budget=fixture['engine']['lod_accuracy_budget'])
+    score_team_red = 0
+    score_team_blue = 0
+    restart_game()
+    
+    offsides = [0, 0]
+    for _ in range(fixture['ticks']):
+        step_simulation()
+        if current_state == OFFSIDE_DETECTED:
+            offsides[offside_player.team] += 1
+            reset_after_offside()
+        elif current_state == GOAL_SCORED:
+            restart_game()  # Kick off again
+    
+    return {
+        'home_goals': score_team_red,
+        'away_goals': score_team_blue,
+        'home_offsides': offsides[0],
+        'away_offsides': offsides[1],
+    }
+
+# Engine version plus every tunable that changes match results
+def engine_settings(lod_accuracy_budget=LOD_ACCURACY_BUDGET):
+    return {
+        'version': ENGINE_VERSION,
+        'friction': FRICTION,
+        'max_player_speed': MAX_PLAYER_SPEED,
+        'max_ball_speed': MAX_BALL_SPEED,
+        'kick_power': KICK_POWER,
+        'player_radius': PLAYER_RADIUS,
+        'ball_radius': BALL_RADIUS,
+        'lane_cache_tolerance': LANE_CACHE_TOLERANCE,
+        'lane_open_distance': LANE_OPEN_DISTANCE,
+        'lane_progress_weight': LANE_PROGRESS_WEIGHT,
+        'pass_target_roles': list(PASS_TARGET_ROLES),
+        'lod_near_distance': LOD_NEAR_DISTANCE,
+        'lod_lookahead': LOD_LOOKAHEAD,
+        'lod_far_interval': LOD_FAR_INTERVAL,
+        'lod_accuracy_budget': lod_accuracy_budget,
+    }
+
+# Cache key covering everything that can change a match result
+def fixture_key(fixture):
+    identity = {
+        # Normalised configs carry the layouts themselves, not just formation names
+        'home': fixture['home_config'],
+        'away': fixture['away_config'],
+        'seed': fixture['seed'],
+        'ticks': fixture['ticks'],
+        'engine': fixture['engine'],
+    }
+    return hashlib.sha256(json.dumps(identity, sort_keys=True).encode()).hexdigest()
+
+# Cached result for a fixture, or None if missing or unreadable (e.g. from an interrupted run)
+def load_cached_result(cache_path):
+    try:
+        with open(cache_path) as cached:
+            return json.load(cached)
+    except (OSError, ValueError):
+        return None
+
+# Write a result so that an interrupted run never leaves a partial file behind
+def store_cached_result(cache_path, result):
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(temp_path, "w") as cached:
+        json.dump(result, cached)
+    os.replace(temp_path, cache_path)
+
+# Validate every team up front so a bad config fails before any match is played
+def normalise_season_teams(teams):
+    if not isinstance(teams, dict) or len(teams) < 2:
+        raise ValueError("a season needs at least two teams, given as {name: config}")
+    return {name: normalise_team_config(name, config) for name, config in teams.items()}
+
+# Double round-robin: every team hosts every other team once
+def season_fixtures(teams, ticks, base_seed, engine):
+    fixtures = []
+    for home in teams:
+        for away in teams:
+            if home == away:
+                continue
+            # Seed from the pairing, so adding a team doesn't reshuffle existing fixtures
+            seed_source = f"{base_seed}:{home}:{away}".encode()
+            fixtures.append({
+                'home': home,
+                'away': away,
+                'home_config': teams[home],
+                'away_config': teams[away],
+                'seed': int(hashlib.sha256(seed_source).hexdigest()[:8], 16),
+                'ticks': ticks,
+                'engine': engine,
+            })
+    return fixtures
+
+# Play a season across all cores, only simulating fixtures missing from the cache
+def run_season(teams, ticks, base_seed, workers=None, cache_dir=".season_cache",
+               lod_accuracy_budget=LOD_ACCURACY_BUDGET):
+    teams = normalise_season_teams(teams)
+    os.makedirs(cache_dir, exist_ok=True)
+    fixtures = season_fixtures(teams, ticks, base_seed, engine_settings(lod_accuracy_budget))
+    
+    results = {}
+    pending = []
+    for fixture in fixtures:
+        key = fixture_key(fixture)
+        result = load_cached_result(os.path.join(cache_dir, key + ".json"))
+        if result is not None:
+            results[key] = result
+        else:
+            pending.append(fixture)
+    
+    print(f"{len(fixtures)} fixtures, {len(fixtures) - len(pending)} cached, {len(pending)} to play", flush=True)
+    if pending:
+        with multiprocessing.Pool(workers) as pool:
+            for fixture, result in zip(pending, pool.imap(simulate_match, pending)):
+                key = fixture_key(fixture)
+                store_cached_result(os.path.join(cache_dir, key + ".json"), result)
+                results[key] = result
+                print(f"  {fixture['home']} {result['home_goals']}-{result['away_goals']} {fixture['away']}", flush=True)
+            # Let workers exit on their own; SDL swallows the SIGTERM terminate() would send
+            pool.close()
+            pool.join()
+    
+    return [(fixture, results[fixture_key(fixture)]) for fixture in fixtures]
+
+# Build the league table and per-team offside statistics from season results
+def league_table(teams, season_results):
+    table = {name: {'P': 0, 'W': 0, 'D': 0, 'L': 0, 'GF': 0, 'GA': 0, 'Pts': 0,
+                    'offsides': 0, 'drawn_offsides': 0} for name in teams}
+    
+    for fixture, result in season_results:
+        for side, other in (('home', 'away'), ('away', 'home')):
+            row = table[fixture[side]]
+            scored = result[side + '_goals']
+            conceded = result[other + '_goals']
+            row['P'] += 1
+            row['GF'] += scored
+            row['GA'] += conceded
+            row['offsides'] += result[side + '_offsides']
+            row['drawn_offsides'] += result[other + '_offsides']  # Offside traps that worked
+            if scored > conceded:
+                row['W'] += 1
+                row['Pts'] += 3
+            elif scored == conceded:
+                row['D'] += 1
+                row['Pts'] += 1
+            else:
+                row['L'] += 1
+    
+    return sorted(table.items(), key=lambda item: (-item[1]['Pts'], item[1]['GA'] - item[1]['GF'], -item[1]['GF']))
+
+def print_league_table(table):
+    print(f"{'Team':<16}{'P':>4}{'W':>4}{'D':>4}{'L':>4}{'GF':>5}{'GA':>5}{'GD':>5}{'Pts':>5}{'Off/gm':>8}{'Trap/gm':>9}")
+    for name, row in table:
+        games = max(1, row['P'])
+        print(f"{name:<16}{row['P']:>4}{row['W']:>4}{row['D']:>4}{row['L']:>4}"
+              f"{row['GF']:>5}{row['GA']:>5}{row['GF'] - row['GA']:>+5}{row['Pts']:>5}"
+              f"{row['offsides'] / games:>8.2f}{row['drawn_offsides'] / games:>9.2f}")
+
+# Play the interactive game
+def run_game():
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            
+            # Track hover so buttons respond to clicks
+            if event.type == pygame.MOUSEMOTION:
+                for button in (restart_button, reset_button, debug_button, split_button):
+                    button.check_hover(event.pos)
+            
+            # Check button events
+            restart_button.handle_event(event)
+            reset_button.handle_event(event)
+            debug_button.handle_event(event)
+            split_button.handle_event(event)
+
+        # Game logic
+        step_simulation()
+
+        # Drawing
+        draw_frame()
     
-    pygame.display.flip()
-    pygame.time.delay(30)
+        pygame.display.flip()
+        pygame.time.delay(30)
 
-pygame.quit()
\ No newline at end of file
+if __name__ == "__main__":
+    if args.soak is not None:
+        run_soak(args.soak, args.soak_interval)
+    elif args.season is not None:
+        season_teams = SEASON_TEAMS
+        try:
+            if args.season:
+                with open(args.season) as config_file:
+                    season_teams = json.load(config_file)
+            normalise_season_teams(season_teams)
+        except (OSError, ValueError) as error:
+            parser.error(f"bad season config: {error}")
+        season_results = run_season(season_teams, args.season_ticks, args.season_seed,
+                                    args.season_workers, args.season_cache,
+                                    lod_budget)
+        print_league_table(league_table(season_teams, season_results))
+    else:
+        run_game()
+    pygame.quit()